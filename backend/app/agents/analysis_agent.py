@@ -6,14 +6,27 @@ Analyzes gathered data and provides structured insights.
 """
 
 from openai import OpenAI
-from typing import Dict, List
+from typing import Dict, List, Tuple
 from datetime import datetime
 import logging
-import json
+import orjson
 import asyncio
 
+from app.agents.llm_cache import analysis_cache
+from app.graph.tracker import progress_fields
+
 logger = logging.getLogger(__name__)
 
+# Static system prompt shared by every analysis request. Keeping this
+# byte-identical across calls lets OpenAI's automatic prefix cache hit;
+# anything that varies per request belongs in the user turn instead.
+ANALYSIS_SYSTEM_PROMPT = """You are a competitive intelligence analyst.
+The company you are presenting to is named in the user message.
+...
+REMEMBER: Write as if presenting TO the client company, not about them.
+Say "<company> should..." not "the competitor should..."
+"""
+
 class AnalysisAgent:
     """
     Builds competitive intelligence reports with GPT-4.
@@ -23,7 +36,7 @@ class AnalysisAgent:
     - Premium (gpt-4o): Higher quality, more expensive
     """
     
-    def __init__(self, openai_api_key: str, use_premium: bool = False, query_id: str = None, db = None):
+    def __init__(self, openai_api_key: str, use_premium: bool = False, query_id: str = None, db = None, tracker=None):
         self.client = OpenAI(
             api_key=openai_api_key,
             timeout=180.0,  # Timeout for analysis and streaming
@@ -33,6 +46,7 @@ class AnalysisAgent:
         self.use_premium = use_premium
         self.query_id = query_id 
         self.db = db
+        self.tracker = tracker
         
         if use_premium:
             self.model = "gpt-4o"
@@ -61,9 +75,9 @@ class AnalysisAgent:
                 **state,
                 "analysis": None,
                 "chart_data": None,
-                "errors": state.get("errors", []) + ["No data available for analysis"],
-                "current_step": "analysis_failed",
-                "completed_agents": state.get("completed_agents", []) + [self.name],
+                **progress_fields(self.tracker, state, self.name,
+                                  step="analysis_failed",
+                                  error="No data available for analysis"),
                 "updated_at": datetime.now()
             }
         
@@ -90,31 +104,52 @@ class AnalysisAgent:
                     except Exception as e:
                         logger.warning(f"Failed to update MongoDB during streaming: {e}")
             
-            # Generate the analysis
-            analysis_result = await self._generate_analysis(
-                query,
-                company_name,
-                competitors,
-                analysis_context,
-                update_callback=update_mongodb if self.query_id and self.db else None
-            )
-            
-            logger.info(f"Analysis complete: {len(analysis_result)} characters")
-            
-            # Extract chart data from the analysis
-            chart_data = await self._extract_chart_data(
-                analysis_result,
-                company_name,
-                competitors
+            # Identical inputs produce an identical report at this
+            # temperature, so serve repeats from the exact-key cache
+            # instead of re-paying both model calls
+            cache_key = analysis_cache.make_key(
+                self.model, query, company_name, competitors, analysis_context
             )
+            cached = analysis_cache.get(cache_key)
+
+            if cached is not None:
+                analysis_result, chart_data = cached
+                logger.info(f"Analysis cache hit: {len(analysis_result)} characters")
+
+                # Streaming never happened, so write the result once
+                if self.query_id and self.db:
+                    await update_mongodb(analysis_result)
+            else:
+                # Generate the analysis
+                analysis_result, stream_complete = await self._generate_analysis(
+                    query,
+                    company_name,
+                    competitors,
+                    analysis_context,
+                    update_callback=update_mongodb if self.query_id and self.db else None
+                )
+                
+                logger.info(f"Analysis complete: {len(analysis_result)} characters")
+                
+                # Extract chart data from the analysis
+                chart_data = await self._extract_chart_data(
+                    analysis_result,
+                    company_name,
+                    competitors
+                )
+
+                # Only cache clean results. A partial stream or a failed
+                # chart parse is transient; caching it would replay the
+                # degraded result for every future identical request.
+                if stream_complete and chart_data is not None:
+                    analysis_cache.put(cache_key, analysis_result, chart_data)
             
             return {
                 **state,
                 "analysis": analysis_result,
                 "chart_data": chart_data,
                 "analysis_mode": "premium" if self.use_premium else "standard",
-                "current_step": "analysis_complete",
-                "completed_agents": state.get("completed_agents", []) + [self.name],
+                **progress_fields(self.tracker, state, self.name, step="analysis_complete"),
                 "updated_at": datetime.now()
             }
             
@@ -124,9 +159,9 @@ class AnalysisAgent:
                 **state,
                 "analysis": None,
                 "chart_data": None,
-                "errors": state.get("errors", []) + [f"Analysis error: {str(e)}"],
-                "current_step": "analysis_failed",
-                "completed_agents": state.get("completed_agents", []) + [self.name],
+                **progress_fields(self.tracker, state, self.name,
+                                  step="analysis_failed",
+                                  error=f"Analysis error: {str(e)}"),
                 "updated_at": datetime.now()
             }
     
@@ -193,13 +228,13 @@ class AnalysisAgent:
         competitors: List[str],
         context: str,
         update_callback=None
-    ) -> str:
-        # Generate a report using GPT with streaming
-        system_prompt = f"""You are a competitive intelligence analyst working for {company_name}.
-...
-REMEMBER: Write as if presenting TO {company_name}, not about them. 
-Say "{company_name} should..." not "the competitor should..."
-"""
+    ) -> Tuple[str, bool]:
+        # Generate a report using GPT with streaming. Returns the text
+        # and whether the stream ran to completion - a partial result
+        # (mid-stream error, empty chunk) comes back with False so the
+        # caller can avoid caching it.
+        # Everything request-specific goes in the user turn so the system
+        # prompt stays static (see ANALYSIS_SYSTEM_PROMPT).
         user_prompt = f"""Analyze this competitive intelligence data for {company_name}:
 QUERY: {query}
 YOUR COMPANY: {company_name}
@@ -211,55 +246,77 @@ Skip section 6 (Additional Insights) if the query only asks about pricing, featu
 
         logger.info(f"Calling {self.model} for analysis (streaming)...")
         
-        # Stream the model's output
+        # The OpenAI client here is sync, so iterating its stream on
+        # the event loop would block every other task for the duration
+        # of each socket read. A producer on an executor thread pumps
+        # chunks into an asyncio queue instead; this coroutine consumes
+        # them and does the async DB updates.
         loop = asyncio.get_event_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        done = object()  # sentinel: producer finished (or failed)
         
-        try:
-            stream = await loop.run_in_executor(
-                None,
-                lambda: self.client.chat.completions.create(
+        def produce_stream():
+            try:
+                stream = self.client.chat.completions.create(
                     model=self.model,
                     messages=[
-                        {"role": "system", "content": system_prompt},
+                        {"role": "system", "content": ANALYSIS_SYSTEM_PROMPT},
                         {"role": "user", "content": user_prompt}
                     ],
                     temperature=0.3,
                     max_tokens=4000,
                     stream=True
                 )
-            )
+                for chunk in stream:
+                    loop.call_soon_threadsafe(queue.put_nowait, chunk)
+            except Exception as e:
+                loop.call_soon_threadsafe(queue.put_nowait, e)
+            finally:
+                loop.call_soon_threadsafe(queue.put_nowait, done)
+        
+        try:
+            producer = loop.run_in_executor(None, produce_stream)
             
-            analysis = ""
+            # Chunks collect in a list and join at the end - appending
+            # to a string would recopy the whole analysis per chunk
+            parts = []
             chunk_count = 0
+            stream_complete = False
             
-            try:
-                for chunk in stream:
-                    if not chunk.choices:
-                        logger.warning("Empty chunk received")
-                        break
-                    if chunk.choices[0].finish_reason:
-                        logger.info(f"Stream finished: {chunk.choices[0].finish_reason}")
-                        if chunk.choices[0].finish_reason == "length":
-                            logger.warning("Analysis truncated due to max_tokens limit")
+            while True:
+                chunk = await queue.get()
+                if chunk is done:
+                    break
+                if isinstance(chunk, Exception):
+                    logger.error(f"Error in stream: {str(chunk)}")
+                    if parts:
+                        logger.warning(f"Returning partial analysis ({sum(len(p) for p in parts)} chars)")
                         break
-                    if chunk.choices[0].delta.content:
-                        content = chunk.choices[0].delta.content
-                        analysis += content
-                        chunk_count += 1
-                        
-                        # Update DB periodically
-                        if update_callback and chunk_count % 20 == 0:
-                            try:
-                                await update_callback(analysis)
-                            except Exception as e:
-                                logger.warning(f"Failed to update DB during streaming: {e}")
-                
-            except Exception as stream_error:
-                logger.error(f"Error in stream: {str(stream_error)}")
-                if analysis:
-                    logger.warning(f"Returning partial analysis ({len(analysis)} chars)")
-                else:
-                    raise
+                    raise chunk
+                if not chunk.choices:
+                    logger.warning("Empty chunk received")
+                    break
+                if chunk.choices[0].finish_reason:
+                    logger.info(f"Stream finished: {chunk.choices[0].finish_reason}")
+                    if chunk.choices[0].finish_reason == "length":
+                        logger.warning("Analysis truncated due to max_tokens limit")
+                    stream_complete = True
+                    break
+                if chunk.choices[0].delta.content:
+                    parts.append(chunk.choices[0].delta.content)
+                    chunk_count += 1
+                    
+                    # Update DB periodically
+                    if update_callback and chunk_count % 20 == 0:
+                        try:
+                            await update_callback("".join(parts))
+                        except Exception as e:
+                            logger.warning(f"Failed to update DB during streaming: {e}")
+            
+            # Let the producer thread wind down before returning
+            await producer
+            
+            analysis = "".join(parts)
             
             # Final DB update
             if update_callback and analysis:
@@ -273,7 +330,7 @@ Skip section 6 (Additional Insights) if the query only asks about pricing, featu
             if not analysis:
                 raise ValueError("Stream completed but no content received")
             
-            return analysis
+            return analysis, stream_complete
             
         except Exception as e:
             logger.error(f"Failed to generate analysis stream: {str(e)}")
@@ -297,12 +354,15 @@ Skip section 6 (Additional Insights) if the query only asks about pricing, featu
         comp_json_examples = []
         for i, comp in enumerate(competitors[:3]):
             comp_json_examples.append(f'"{comp}": {7 + i}')
-        
+
         competitors_json = ',\n            '.join(comp_json_examples)
-        
+
         extraction_prompt = f"""Extract structured data from this analysis for charts...
 [Prompt truncated for brevity]"""
 
+        # One request covers every competitor - the response is a single JSON
+        # object keyed per competitor, so we never pay N round trips here.
+
         try:
             logger.info("Extracting chart data...")
             loop = asyncio.get_event_loop()
@@ -316,7 +376,8 @@ Skip section 6 (Additional Insights) if the query only asks about pricing, featu
                         {"role": "user", "content": extraction_prompt}
                     ],
                     temperature=0.1,
-                    max_tokens=1500
+                    max_tokens=1500,
+                    response_format={"type": "json_object"}
                 )
             )
             
@@ -328,7 +389,7 @@ Skip section 6 (Additional Insights) if the query only asks about pricing, featu
                     chart_data_str = chart_data_str[4:]
             chart_data_str = chart_data_str.strip()
             
-            chart_data = json.loads(chart_data_str)
+            chart_data = orjson.loads(chart_data_str)
             
             if not isinstance(chart_data.get('pricing'), list):
                 raise ValueError("Invalid pricing data")
@@ -343,7 +404,7 @@ Skip section 6 (Additional Insights) if the query only asks about pricing, featu
             
             return chart_data
             
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             logger.error(f"Failed to parse chart JSON: {str(e)}")
             logger.error(f"Raw response: {chart_data_str[:200]}...")
             return None
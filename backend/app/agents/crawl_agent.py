@@ -11,13 +11,20 @@ from datetime import datetime
 import logging
 import asyncio
 
+from app.graph.tracker import progress_fields
+from app.utils.urls import normalize_url
+
 logger = logging.getLogger(__name__)
 
 class CrawlAgent:
     # Crawls competitor sites to gather comprehensive information from multiple pages
-    def __init__(self, tavily_api_key: str):
-        self.client = TavilyClient(api_key=tavily_api_key)
+    def __init__(self, tavily_api_key: str, tracker=None, client: TavilyClient = None):
+        # Accept a shared TavilyClient so agents in one workflow reuse
+        # its HTTP session (and pooled connections) instead of opening
+        # their own
+        self.client = client if client is not None else TavilyClient(api_key=tavily_api_key)
         self.name = "crawl"
+        self.tracker = tracker
     
     async def execute(self, state: Dict) -> Dict:
         # Deep crawl competitor websites for thorough analysis
@@ -28,7 +35,8 @@ class CrawlAgent:
             return {
                 **state,
                 "crawl_results": [],
-                "errors": state.get("errors", []) + ["No research results for crawling"]
+                **progress_fields(self.tracker, state, self.name,
+                                  error="No research results for crawling", completed=False)
             }
         
         logger.info("Starting deep crawl...")
@@ -43,34 +51,38 @@ class CrawlAgent:
             return {
                 **state,
                 "crawl_results": [],
-                "current_step": "crawl_complete",
-                "completed_agents": state.get("completed_agents", []) + [self.name],
+                **progress_fields(self.tracker, state, self.name, step="crawl_complete"),
                 "updated_at": datetime.now()
             }
         
-        # Crawl everything in parallel
-        tasks = [
-            self._crawl_competitor_site(item)
-            for item in urls_to_crawl
-        ]
+        # Crawl everything in parallel, keeping each item's context with
+        # its task so unexpected failures produce well-formed entries
+        async def crawl_one(item: Dict) -> Dict:
+            try:
+                return await self._crawl_competitor_site(item)
+            except Exception as e:
+                logger.error(f"Crawl failed for {item['competitor']}: {str(e)}")
+                return {
+                    "competitor": item["competitor"],
+                    "url": item["url"],
+                    "status": "error",
+                    "error": str(e),
+                    "crawled_at": datetime.now().isoformat()
+                }
+
+        tasks = [crawl_one(item) for item in urls_to_crawl]
         
         logger.info(f"Crawling {len(tasks)} sites in parallel...")
-        crawl_results = await asyncio.gather(*tasks, return_exceptions=True)
-        
-        # Check for failures
+
+        # Collect as they finish; nothing downstream depends on order
         processed_results = []
-        for i, result in enumerate(crawl_results):
-            if isinstance(result, Exception):
-                logger.error(f"Crawl failed for {urls_to_crawl[i]['competitor']}: {str(result)}")
-                processed_results.append({
-                    "competitor": urls_to_crawl[i]["competitor"],
-                    "url": urls_to_crawl[i]["url"],
-                    "status": "error",
-                    "error": str(result),
-                    "crawled_at": datetime.now().isoformat()
-                })
-            else:
-                processed_results.append(result)
+        for future in asyncio.as_completed(tasks):
+            result = await future
+            processed_results.append(result)
+            logger.info(
+                "Crawl %d/%d complete: %s",
+                len(processed_results), len(tasks), result.get("competitor", "unknown")
+            )
         
         success_count = sum(1 for r in processed_results if r.get("status") == "success")
         logger.info(f"Crawl done: {success_count}/{len(processed_results)} successful")
@@ -78,8 +90,7 @@ class CrawlAgent:
         return {
             **state,
             "crawl_results": processed_results,
-            "current_step": "crawl_complete",
-            "completed_agents": state.get("completed_agents", []) + [self.name],
+            **progress_fields(self.tracker, state, self.name, step="crawl_complete"),
             "updated_at": datetime.now()
         }
     
@@ -157,6 +168,7 @@ class CrawlAgent:
         We prefer pricing/features pages since they have the most useful info.
         """
         urls_to_crawl = []
+        seen = set()
         
         for result in research_results:
             if result.get("status") != "success":
@@ -169,12 +181,24 @@ class CrawlAgent:
             # Find the best page to start from
             crawl_url = self._find_best_crawl_url(results_list)
             
-            if crawl_url:
-                urls_to_crawl.append({
-                    "competitor": competitor,
-                    "url": crawl_url["url"],
-                    "focus": crawl_url["focus"]
-                })
+            if not crawl_url:
+                continue
+
+            # Two competitors' searches can elect the same start page
+            # (shared comparison sites, one vendor behind two products);
+            # crawling it twice doubles the slowest Tavily call for
+            # nothing
+            key = normalize_url(crawl_url["url"])
+            if key in seen:
+                logger.debug(f"Skipping duplicate crawl start: {crawl_url['url']}")
+                continue
+            seen.add(key)
+
+            urls_to_crawl.append({
+                "competitor": competitor,
+                "url": crawl_url["url"],
+                "focus": crawl_url["focus"]
+            })
         
         return urls_to_crawl
     
@@ -11,21 +11,26 @@ from tavily import TavilyClient
 from typing import List, Dict
 from datetime import datetime
 import logging
-import json
+import orjson
+
+from app.graph.tracker import progress_fields
 
 logger = logging.getLogger(__name__)
 
 class CompetitorDiscoveryAgent:
     # Discovers competitors by analyzing company profile and searching the web
     
-    def __init__(self, tavily_api_key: str, openai_api_key: str):
-        self.tavily_client = TavilyClient(api_key=tavily_api_key)
+    def __init__(self, tavily_api_key: str, openai_api_key: str, tracker=None, tavily_client: TavilyClient = None):
+        # Shared TavilyClient (see ResearchAgent) keeps all Tavily
+        # traffic for a workflow on one pooled HTTP session
+        self.tavily_client = tavily_client if tavily_client is not None else TavilyClient(api_key=tavily_api_key)
         self.openai_client = OpenAI(
             api_key=openai_api_key,
             timeout=60.0,  # 1 minute timeout for discovery
             max_retries=3
         )
         self.name = "competitor_discovery"
+        self.tracker = tracker
     
     async def execute(self, state: Dict) -> Dict:
         # Main execution method - finds competitors and updates workflow state
@@ -37,8 +42,8 @@ class CompetitorDiscoveryAgent:
             return {
                 **state,
                 "competitors": [],
-                "errors": state.get("errors", []) + ["No company name provided"],
-                "completed_agents": state.get("completed_agents", []) + [self.name]
+                **progress_fields(self.tracker, state, self.name,
+                                  error="No company name provided")
             }
         
         logger.info(f"Starting competitor discovery for: {company_name}")
@@ -66,8 +71,7 @@ class CompetitorDiscoveryAgent:
                 **state,
                 "competitors": competitors,
                 "company_info": company_info,
-                "current_step": "competitor_discovery_complete",
-                "completed_agents": state.get("completed_agents", []) + [self.name],
+                **progress_fields(self.tracker, state, self.name, step="competitor_discovery_complete"),
                 "updated_at": datetime.now()
             }
             
@@ -76,8 +80,8 @@ class CompetitorDiscoveryAgent:
             return {
                 **state,
                 "competitors": [],
-                "errors": state.get("errors", []) + [f"Discovery error: {str(e)}"],
-                "completed_agents": state.get("completed_agents", []) + [self.name],
+                **progress_fields(self.tracker, state, self.name,
+                                  error=f"Discovery error: {str(e)}"),
                 "updated_at": datetime.now()
             }
     
@@ -127,7 +131,7 @@ class CompetitorDiscoveryAgent:
             response_format={"type": "json_object"}
         )
         
-        result = json.loads(response.choices[0].message.content)
+        result = orjson.loads(response.choices[0].message.content)
         logger.info(f"Used {response.usage.total_tokens} tokens")
         
         return result
@@ -254,7 +258,7 @@ class CompetitorDiscoveryAgent:
                 response_format={"type": "json_object"}
             )
             
-            result = json.loads(response.choices[0].message.content)
+            result = orjson.loads(response.choices[0].message.content)
             competitors = result.get("competitors", [])
             
             logger.info(f"Extracted {len(competitors)} competitors from search")
@@ -299,7 +303,7 @@ class CompetitorDiscoveryAgent:
                 response_format={"type": "json_object"}
             )
             
-            result = json.loads(response.choices[0].message.content)
+            result = orjson.loads(response.choices[0].message.content)
             competitors = result.get("competitors", [])
             
             logger.info(f"GPT suggested {len(competitors)} competitors")
@@ -11,13 +11,23 @@ from datetime import datetime
 import logging
 import asyncio
 
+from app.graph.tracker import progress_fields
+from app.utils.urls import normalize_url
+
 logger = logging.getLogger(__name__)
 
 class ExtractionAgent:
     # Extracts clean content from URLs found during research
-    def __init__(self, tavily_api_key: str):
-        self.client = TavilyClient(api_key=tavily_api_key)
+    # Tavily's documented per-request URL cap for /extract
+    EXTRACT_BATCH_SIZE = 20
+
+    def __init__(self, tavily_api_key: str, tracker=None, client: TavilyClient = None):
+        # Accept a shared TavilyClient so agents in one workflow reuse
+        # its HTTP session (and pooled connections) instead of opening
+        # their own
+        self.client = client if client is not None else TavilyClient(api_key=tavily_api_key)
         self.name = "extraction"
+        self.tracker = tracker
     
     async def execute(self, state: Dict) -> Dict:
         # Extract content from all research URLs in parallel
@@ -28,7 +38,8 @@ class ExtractionAgent:
             return {
                 **state,
                 "extracted_data": [],
-                "errors": state.get("errors", []) + ["No research results available"]
+                **progress_fields(self.tracker, state, self.name,
+                                  error="No research results available", completed=False)
             }
         
         logger.info("Starting extraction...")
@@ -43,34 +54,26 @@ class ExtractionAgent:
             return {
                 **state,
                 "extracted_data": [],
-                "current_step": "extraction_complete",
-                "completed_agents": state.get("completed_agents", []) + [self.name],
+                **progress_fields(self.tracker, state, self.name, step="extraction_complete"),
                 "updated_at": datetime.now()
             }
         
-        # Extract everything in parallel
-        tasks = [
-            self._extract_url(item) 
-            for item in urls_to_extract
+        # Tavily /extract takes many URLs per request, so batch instead
+        # of paying one round trip per URL; batches still run in
+        # parallel when there are several
+        batches = [
+            urls_to_extract[i:i + self.EXTRACT_BATCH_SIZE]
+            for i in range(0, len(urls_to_extract), self.EXTRACT_BATCH_SIZE)
         ]
+        tasks = [self._extract_batch(batch) for batch in batches]
         
-        logger.info(f"Extracting {len(tasks)} URLs in parallel...")
-        extracted_data = await asyncio.gather(*tasks, return_exceptions=True)
-        
-        # Check for failures
+        logger.info(f"Extracting {len(urls_to_extract)} URLs in {len(tasks)} batched requests...")
+
+        # Collect as they finish; nothing downstream depends on order
         processed_data = []
-        for i, result in enumerate(extracted_data):
-            if isinstance(result, Exception):
-                logger.error(f"Failed to extract {urls_to_extract[i]['url']}: {str(result)}")
-                processed_data.append({
-                    "competitor": urls_to_extract[i]["competitor"],
-                    "url": urls_to_extract[i]["url"],
-                    "status": "error",
-                    "error": str(result),
-                    "extracted_at": datetime.now().isoformat()
-                })
-            else:
-                processed_data.append(result)
+        for future in asyncio.as_completed(tasks):
+            processed_data.extend(await future)
+            logger.info("Extraction %d/%d URLs done", len(processed_data), len(urls_to_extract))
         
         success_count = sum(1 for d in processed_data if d.get("status") == "success")
         logger.info(f"Extraction done: {success_count}/{len(processed_data)} successful")
@@ -78,61 +81,93 @@ class ExtractionAgent:
         return {
             **state,
             "extracted_data": processed_data,
-            "current_step": "extraction_complete",
-            "completed_agents": state.get("completed_agents", []) + [self.name],
+            **progress_fields(self.tracker, state, self.name, step="extraction_complete"),
             "updated_at": datetime.now()
         }
     
-    async def _extract_url(self, item: Dict) -> Dict:
-        # Extract content from a single URL
-        url = item["url"]
-        competitor = item["competitor"]
+    async def _extract_batch(self, items: List[Dict]) -> List[Dict]:
+        # Extract a batch of URLs with one Tavily request and map the
+        # response entries back onto the items that asked for them
+        urls = [item["url"] for item in items]
+        by_url = {normalize_url(item["url"]): item for item in items}
+        extracted_at = datetime.now().isoformat()
         
-        logger.info(f"Extracting: {url[:60]}...")
+        logger.info(f"Extracting batch of {len(urls)} URLs...")
         
         try:
             # Tavily client is sync, wrap it to make it async
             loop = asyncio.get_event_loop()
             response = await loop.run_in_executor(
                 None,
-                lambda: self.client.extract(urls=[url])
+                lambda: self.client.extract(urls=urls)
             )
-            
-            # Check if we got content back
-            if response and "results" in response and len(response["results"]) > 0:
-                result = response["results"][0]
-                raw_content = result.get("raw_content", "")
-                
-                logger.info(f"Got {len(raw_content)} characters from {competitor}")
-                
-                return {
-                    "competitor": competitor,
-                    "url": url,
-                    "title": item.get("title", ""),
-                    "raw_content": raw_content,
-                    "content_length": len(raw_content),
-                    "extracted_at": datetime.now().isoformat(),
-                    "status": "success"
-                }
-            else:
-                logger.warning(f"No content from {url}")
-                return {
-                    "competitor": competitor,
-                    "url": url,
+        except Exception as e:
+            logger.error(f"Batch extraction failed for {len(urls)} URLs: {str(e)}")
+            return [
+                {
+                    "competitor": item["competitor"],
+                    "url": item["url"],
                     "status": "error",
-                    "error": "No content in response",
-                    "extracted_at": datetime.now().isoformat()
+                    "error": str(e),
+                    "extracted_at": extracted_at
                 }
-                
-        except Exception as e:
-            logger.error(f"Extraction error for {url}: {str(e)}")
-            return {
-                "competitor": competitor,
-                "url": url,
+                for item in items
+            ]
+        
+        extracted = []
+        matched = set()
+        response = response or {}
+        
+        for result in response.get("results", []):
+            key = normalize_url(result.get("url", ""))
+            item = by_url.get(key)
+            if item is None:
+                continue
+            matched.add(key)
+            
+            raw_content = result.get("raw_content") or ""
+            logger.info(f"Got {len(raw_content)} characters from {item['competitor']}")
+            
+            extracted.append({
+                "competitor": item["competitor"],
+                "url": item["url"],
+                "title": item.get("title", ""),
+                "raw_content": raw_content,
+                "content_length": len(raw_content),
+                "extracted_at": extracted_at,
+                "status": "success"
+            })
+        
+        for failed in response.get("failed_results", []):
+            key = normalize_url(failed.get("url", ""))
+            item = by_url.get(key)
+            if item is None or key in matched:
+                continue
+            matched.add(key)
+            
+            logger.warning(f"Extraction failed for {item['url']}")
+            extracted.append({
+                "competitor": item["competitor"],
+                "url": item["url"],
                 "status": "error",
-                "error": str(e),
-                "extracted_at": datetime.now().isoformat()
-            }
+                "error": failed.get("error", "Extraction failed"),
+                "extracted_at": extracted_at
+            })
+        
+        # Anything the response never mentioned keeps the old
+        # no-content error shape
+        for key, item in by_url.items():
+            if key not in matched:
+                logger.warning(f"No content from {item['url']}")
+                extracted.append({
+                    "competitor": item["competitor"],
+                    "url": item["url"],
+                    "status": "error",
+                    "error": "No content in response",
+                    "extracted_at": extracted_at
+                })
+        
+        return extracted
     
     def _collect_urls(
         self, 
@@ -144,6 +179,7 @@ class ExtractionAgent:
         Takes top 2 per competitor by default - usually enough for good coverage
         """
         urls_to_extract = []
+        seen = set()
         
         for result in research_results:
             # Skip if research failed for this competitor
@@ -154,16 +190,27 @@ class ExtractionAgent:
             competitor = result.get("competitor")
             results_list = result.get("results", [])
             
-            # Grab top N (Here 2) URLs for this competitor
+            # Grab top N (Here 2) URLs for this competitor. Searches for
+            # related competitors often surface the same comparison
+            # pages, so dedupe on normalized URL - each page is fetched
+            # once no matter how many searches returned it.
             for item in results_list[:max_per_competitor]:
                 url = item.get("url")
-                if url:
-                    urls_to_extract.append({
-                        "competitor": competitor,
-                        "url": url,
-                        "title": item.get("title", ""),
-                        "score": item.get("score", 0)
-                    })
+                if not url:
+                    continue
+
+                key = normalize_url(url)
+                if key in seen:
+                    logger.debug(f"Skipping duplicate URL: {url}")
+                    continue
+                seen.add(key)
+
+                urls_to_extract.append({
+                    "competitor": competitor,
+                    "url": url,
+                    "title": item.get("title", ""),
+                    "score": item.get("score", 0)
+                })
         
         return urls_to_extract
     
@@ -0,0 +1,81 @@
+"""
+Exact-key cache for LLM analysis results.
+
+Repeated runs over the same data (CI, the pipeline test's hard-coded
+competitor list, re-submitted queries) regenerate byte-identical prompts
+and pay full GPT latency and spend every time. This cache keys on the
+exact generation inputs, so a hit returns in microseconds what the model
+would have taken seconds to reproduce.
+"""
+
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+import hashlib
+import logging
+
+import orjson
+
+logger = logging.getLogger(__name__)
+
+
+class AnalysisCache:
+    """
+    Process-wide LRU cache for generated analyses.
+
+    Keyed on sha256 of the exact call inputs (model, query, company,
+    competitors, prepared context), so a hit can only be served for a
+    byte-identical prompt. No semantic matching on purpose: an embedding
+    index would drag in a vector dependency to fuzzily serve a cache
+    whose real traffic is repeated identical runs.
+    """
+
+    def __init__(self, maxsize: int = 32):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[str, Optional[Dict]]]" = OrderedDict()
+
+    @staticmethod
+    def make_key(
+        model: str,
+        query: str,
+        company_name: str,
+        competitors: List[str],
+        context: str
+    ) -> str:
+        # Everything that shapes the generated analysis goes into the key
+        payload = orjson.dumps({
+            "model": model,
+            "query": query,
+            "company_name": company_name,
+            "competitors": competitors,
+            "context": context,
+        })
+        return hashlib.sha256(payload).hexdigest()
+
+    def get(self, key: str) -> Optional[Tuple[str, Optional[Dict]]]:
+        # Returns (analysis, chart_data) or None; hits refresh recency
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key: str, analysis: str, chart_data: Optional[Dict]):
+        self._entries[key] = (analysis, chart_data)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def __repr__(self):
+        return (
+            f"AnalysisCache(size={len(self._entries)}/{self.maxsize}, "
+            f"hits={self.hits}, misses={self.misses})"
+        )
+
+
+# Shared by every AnalysisAgent in the process
+analysis_cache = AnalysisCache()
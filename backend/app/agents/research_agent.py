@@ -11,13 +11,19 @@ from datetime import datetime
 import logging
 import asyncio
 
+from app.graph.tracker import progress_fields
+
 logger = logging.getLogger(__name__)
 
 class ResearchAgent:
     # Handles web search for all competitors using Tavily
-    def __init__(self, tavily_api_key: str):
-        self.client = TavilyClient(api_key=tavily_api_key)
+    def __init__(self, tavily_api_key: str, tracker=None, client: TavilyClient = None):
+        # Accept a shared TavilyClient so agents in one workflow reuse
+        # its HTTP session (and pooled connections) instead of opening
+        # their own
+        self.client = client if client is not None else TavilyClient(api_key=tavily_api_key)
         self.name = "research"
+        self.tracker = tracker
     
     async def execute(self, state: Dict) -> Dict:
         # Run searches for all competitors in parallel
@@ -41,29 +47,26 @@ class ResearchAgent:
         ]
         
         logger.info(f"Running {len(tasks)} searches in parallel...")
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-        
-        # Check for any failures
+
+        # Consume searches as they finish instead of waiting on the
+        # slowest with gather - progress shows up the moment each
+        # competitor's search lands. Downstream consumers key results
+        # by competitor, so completion order is fine.
         processed_results = []
-        for i, result in enumerate(results):
-            if isinstance(result, Exception):
-                logger.error(f"Search failed for {competitors[i]}: {str(result)}")
-                processed_results.append({
-                    "competitor": competitors[i],
-                    "status": "error",
-                    "error": str(result),
-                    "timestamp": datetime.now().isoformat()
-                })
-            else:
-                processed_results.append(result)
+        for future in asyncio.as_completed(tasks):
+            result = await future
+            processed_results.append(result)
+            logger.info(
+                "Research %d/%d complete: %s",
+                len(processed_results), len(tasks), result.get("competitor", "unknown")
+            )
         
         logger.info(f"Research complete: {len(competitors)} competitors searched")
         
         return {
             **state,
             "research_results": processed_results,
-            "current_step": "research_complete",
-            "completed_agents": state.get("completed_agents", []) + [self.name],
+            **progress_fields(self.tracker, state, self.name, step="research_complete"),
             "updated_at": datetime.now()
         }
     
@@ -4,6 +4,8 @@ Application configuration.
 Loads settings from environment variables and .env file.
 """
 
+from functools import cached_property
+
 from pydantic_settings import BaseSettings
 from typing import List, Optional
 
@@ -44,5 +46,26 @@ class Settings(BaseSettings):
             return [o.strip() for o in self.cors_origins.replace("[","").replace("]","").replace('"','').split(",")]
         return self.cors_origins
 
+    # Display-safe strings computed once per process instead of being
+    # re-sliced wherever they get printed or logged
+
+    @cached_property
+    def masked_mongodb_uri(self) -> str:
+        """mongodb_uri with the credentials replaced, safe to print."""
+        uri = self.mongodb_uri or ""
+        if "://" in uri and "@" in uri:
+            return uri.replace(uri.split('@')[0].split('://')[1], "***:***")
+        return uri
+
+    @cached_property
+    def tavily_key_preview(self) -> str:
+        """First 20 characters of the Tavily key, for diagnostics."""
+        return (self.tavily_api_key or "")[:20]
+
+    @cached_property
+    def openai_key_preview(self) -> str:
+        """First 20 characters of the OpenAI key, for diagnostics."""
+        return (self.openai_api_key or "")[:20]
+
 
 settings = Settings()
\ No newline at end of file
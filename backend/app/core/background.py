@@ -13,6 +13,7 @@ from app.graph.workflow import (
     create_competitive_intelligence_workflow,
     create_initial_state
 )
+from app.graph.tracker import WorkflowTracker
 from app.services.mongodb_service import MongoDBService
 
 logger = logging.getLogger(__name__)
@@ -36,13 +37,18 @@ async def run_workflow_background(
     logger.info(f"Starting workflow for query {query_id}")
     
     try:
+        # Progress side channel - agents record steps/errors here instead
+        # of threading them through the graph state
+        tracker = WorkflowTracker()
+
         # Initialize the workflow with API keys and streaming
         workflow = create_competitive_intelligence_workflow(
             tavily_api_key=tavily_api_key,
             openai_api_key=openai_api_key,
             use_premium_analysis=use_premium_analysis,
             query_id=query_id,
-            db=db
+            db=db,
+            tracker=tracker
         )
         
         # Build initial workflow state
@@ -57,37 +63,40 @@ async def run_workflow_background(
         
         logger.info(f"Initial state prepared - use_auto_discovery: {initial_state.get('use_auto_discovery')}, type: {type(initial_state.get('use_auto_discovery'))}")
         
-        final_state = None
+        final_state = {}
         last_analysis_update = None
-        
-        # Stream workflow state updates
+
+        # Stream workflow state updates; nodes emit partial updates, so
+        # accumulate them into one view of the run
         async for state in workflow.astream(initial_state):
             for node_name, node_state in state.items():
-                final_state = node_state
-            
-            completed_agents = node_state.get("completed_agents", [])
-            current_analysis = node_state.get("analysis")
+                final_state.update(node_state)
+
+            # Progress comes from the tracker side channel
+            progress = tracker.snapshot()
+            completed_agents = progress["completed_agents"]
+            current_analysis = final_state.get("analysis")
             is_analysis_agent = node_name == "analyze" or "analysis" in completed_agents
-            
+
             # Prepare MongoDB update
             update_data = {
                 "status": "processing",
-                "competitors": node_state.get("competitors", []),
-                "company_info": node_state.get("company_info"),
-                "research_results": node_state.get("research_results", []),
-                "extracted_data": node_state.get("extracted_data", []),
-                "crawl_results": node_state.get("crawl_results", []),
+                "competitors": final_state.get("competitors", []),
+                "company_info": final_state.get("company_info"),
+                "research_results": final_state.get("research_results", []),
+                "extracted_data": final_state.get("extracted_data", []),
+                "crawl_results": final_state.get("crawl_results", []),
                 "completed_agents": completed_agents,
-                "current_step": node_state.get("current_step", "processing"),
-                "errors": node_state.get("errors", []),
+                "current_step": progress["current_step"],
+                "errors": progress["errors"],
                 "updated_at": datetime.now()
             }
-            
+
             # Include analysis if available
             if current_analysis:
                 update_data["analysis"] = current_analysis
-                if node_state.get("chart_data"):
-                    update_data["chart_data"] = node_state.get("chart_data")
+                if final_state.get("chart_data"):
+                    update_data["chart_data"] = final_state.get("chart_data")
                 
                 # Only update DB when analysis grows significantly
                 if is_analysis_agent and current_analysis != last_analysis_update:
@@ -1,4 +1,5 @@
 from .state import CompetitiveIntelligenceState
+from .tracker import WorkflowTracker
 from .workflow import (
     create_competitive_intelligence_workflow,
     create_initial_state
@@ -6,6 +7,7 @@ from .workflow import (
 
 __all__ = [
     "CompetitiveIntelligenceState",
+    "WorkflowTracker",
     "create_competitive_intelligence_workflow",
     "create_initial_state"
 ]
\ No newline at end of file
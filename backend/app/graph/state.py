@@ -77,10 +77,11 @@ class CompetitiveIntelligenceState(TypedDict):
     analysis: Annotated[Optional[str], keep_last]       # Written by analysis agent
     chart_data: Annotated[Optional[Dict], keep_last]    # Written by analysis agent
     
-    # Workflow metadata
-    current_step: Annotated[str, keep_last]             # Updated by multiple agents
-    completed_agents: Annotated[List[str], merge_lists] # Agents append to this
-    errors: Annotated[List[str], merge_lists]          # Agents append errors
+    # Workflow metadata - tracked on the WorkflowTracker side channel
+    # during the run; the finalize node writes the snapshot here once
+    current_step: Annotated[str, keep_last]
+    completed_agents: Annotated[List[str], merge_lists]
+    errors: Annotated[List[str], merge_lists]
     
     # Timestamps
     started_at: Annotated[datetime, keep_unchanged]
@@ -0,0 +1,97 @@
+"""
+Side-channel progress tracking for the workflow.
+
+current_step / completed_agents / errors used to be threaded through the
+graph state, which meant every superstep re-copied and re-merged three
+fields that nothing in the graph branches on. The tracker keeps that
+bookkeeping outside the state; the workflow folds a snapshot back into
+the final state once so API responses keep their shape.
+"""
+
+from typing import Dict, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class WorkflowTracker:
+    """
+    Collects workflow progress outside the graph state.
+
+    One tracker per workflow run. All agents run on the same event loop,
+    so plain list appends are safe here.
+    """
+
+    def __init__(self):
+        self.current_step: str = "initialized"
+        self.completed_agents: List[str] = []
+        self.errors: List[str] = []
+
+    def reset(self):
+        # Clear progress before reusing the tracker for another run
+        # (e.g. a cached compiled workflow that keeps its tracker)
+        self.current_step = "initialized"
+        self.completed_agents.clear()
+        self.errors.clear()
+
+    def record_step(self, step: str):
+        # Record the most recent workflow step
+        self.current_step = step
+
+    def record_completion(self, agent_name: str):
+        # Record that an agent finished (success or failure)
+        if agent_name not in self.completed_agents:
+            self.completed_agents.append(agent_name)
+
+    def record_error(self, error: str):
+        # Record an error message from an agent
+        self.errors.append(error)
+
+    def snapshot(self) -> Dict:
+        # Current progress in the same shape the state fields used
+        return {
+            "current_step": self.current_step,
+            "completed_agents": list(self.completed_agents),
+            "errors": list(self.errors),
+        }
+
+    def __repr__(self):
+        return (
+            f"WorkflowTracker(step={self.current_step}, "
+            f"completed={len(self.completed_agents)}, errors={len(self.errors)})"
+        )
+
+
+def progress_fields(
+    tracker: Optional[WorkflowTracker],
+    state: Dict,
+    agent_name: str,
+    step: Optional[str] = None,
+    error: Optional[str] = None,
+    completed: bool = True
+) -> Dict:
+    """
+    Record agent progress.
+
+    With a tracker attached (workflow runs) the bookkeeping goes to the
+    side channel and nothing is merged into state. Without one
+    (standalone agent use, e.g. the pipeline test) the legacy tracking
+    fields are returned for merging into the returned state.
+    """
+    if tracker is not None:
+        if step:
+            tracker.record_step(step)
+        if error:
+            tracker.record_error(error)
+        if completed:
+            tracker.record_completion(agent_name)
+        return {}
+
+    fields = {}
+    if step:
+        fields["current_step"] = step
+    if error:
+        fields["errors"] = state.get("errors", []) + [error]
+    if completed:
+        fields["completed_agents"] = state.get("completed_agents", []) + [agent_name]
+    return fields
@@ -5,11 +5,13 @@ Orchestrates all agents in sequence to produce competitive intelligence reports.
 """
 
 from langgraph.graph import StateGraph, END
+from tavily import TavilyClient
 from typing import Dict, List
 from datetime import datetime
 import logging
 
 from .state import CompetitiveIntelligenceState
+from .tracker import WorkflowTracker
 from app.agents.discovery_agent import CompetitorDiscoveryAgent
 from app.agents.research_agent import ResearchAgent
 from app.agents.extraction_agent import ExtractionAgent
@@ -18,13 +20,18 @@ from app.agents.analysis_agent import AnalysisAgent
 
 logger = logging.getLogger(__name__)
 
+# String spellings of a truthy auto-discovery flag (seen when the flag
+# round-trips through MongoDB or query params as text)
+_TRUTHY_FLAGS = frozenset(("true", "1", "yes"))
+
 
 def create_competitive_intelligence_workflow(
     tavily_api_key: str,
     openai_api_key: str,
     use_premium_analysis: bool = False,
     query_id: str = None,
-    db = None
+    db = None,
+    tracker: WorkflowTracker = None
 ) -> StateGraph:
     """
     Build the competitive intelligence workflow.
@@ -35,16 +42,28 @@ def create_competitive_intelligence_workflow(
     - Extraction Agent (parallel with Crawl)
     - Crawl Agent (parallel with Extraction)
     - Analysis Agent
+
+    Progress tracking goes through a WorkflowTracker side channel instead
+    of the graph state; pass one in to observe progress mid-run.
     """
 
     logger.info("Building workflow...")
 
-    # Initialize agents
-    discovery_agent = CompetitorDiscoveryAgent(tavily_api_key, openai_api_key)
-    research_agent = ResearchAgent(tavily_api_key)
-    extraction_agent = ExtractionAgent(tavily_api_key)
-    crawl_agent = CrawlAgent(tavily_api_key)
-    analysis_agent = AnalysisAgent(openai_api_key, use_premium_analysis, query_id, db)
+    if tracker is None:
+        tracker = WorkflowTracker()
+
+    # Initialize agents. All four Tavily-backed agents share a single
+    # client, so every Tavily call in the workflow rides one pooled
+    # HTTP session instead of four cold ones.
+    tavily_client = TavilyClient(api_key=tavily_api_key)
+
+    discovery_agent = CompetitorDiscoveryAgent(
+        tavily_api_key, openai_api_key, tracker=tracker, tavily_client=tavily_client
+    )
+    research_agent = ResearchAgent(tavily_api_key, tracker=tracker, client=tavily_client)
+    extraction_agent = ExtractionAgent(tavily_api_key, tracker=tracker, client=tavily_client)
+    crawl_agent = CrawlAgent(tavily_api_key, tracker=tracker, client=tavily_client)
+    analysis_agent = AnalysisAgent(openai_api_key, use_premium_analysis, query_id, db, tracker=tracker)
 
     logger.info(f"Agents initialized: Discovery, Research, Extraction, Crawl, Analysis")
 
@@ -58,17 +77,14 @@ def create_competitive_intelligence_workflow(
     workflow.add_node("crawl", crawl_agent.execute)
     workflow.add_node("analyze", analysis_agent.execute)
 
-    # Conditional entry: start with discovery if auto-discovery enabled
+    # Conditional entry: start with discovery if auto-discovery enabled.
+    # LangGraph always hands nodes the TypedDict state as a plain dict, so
+    # a single .get() covers every case; the string check handles flags
+    # that round-tripped through storage as "true"/"false".
     def route_start(state: CompetitiveIntelligenceState) -> str:
-        use_auto_discovery = False
-        if isinstance(state, dict):
-            use_auto_discovery = state.get("use_auto_discovery", False)
-        elif hasattr(state, "use_auto_discovery"):
-            use_auto_discovery = getattr(state, "use_auto_discovery", False)
+        use_auto_discovery = state.get("use_auto_discovery", False)
         if isinstance(use_auto_discovery, str):
-            use_auto_discovery = use_auto_discovery.lower() in ("true", "1", "yes")
-        else:
-            use_auto_discovery = bool(use_auto_discovery)
+            use_auto_discovery = use_auto_discovery.lower() in _TRUTHY_FLAGS
         return "discovery" if use_auto_discovery else "research"
 
     workflow.set_conditional_entry_point(
@@ -78,10 +94,19 @@ def create_competitive_intelligence_workflow(
 
     # Join node: waits for extraction and crawl to complete
     def join_data_collection(state: CompetitiveIntelligenceState) -> CompetitiveIntelligenceState:
-        return {**state, "current_step": "data_collection_complete"}
+        tracker.record_step("data_collection_complete")
+        return {}
 
     workflow.add_node("join_data", join_data_collection)
 
+    # Final node: fold the tracker's progress back into state once, so the
+    # final result keeps current_step/completed_agents/errors without the
+    # graph re-merging them on every superstep
+    def finalize(state: CompetitiveIntelligenceState) -> CompetitiveIntelligenceState:
+        return tracker.snapshot()
+
+    workflow.add_node("finalize", finalize)
+
     # Connect edges
     workflow.add_edge("discovery", "research")
     workflow.add_edge("research", "extraction")
@@ -89,9 +114,10 @@ def create_competitive_intelligence_workflow(
     workflow.add_edge("extraction", "join_data")
     workflow.add_edge("crawl", "join_data")
     workflow.add_edge("join_data", "analyze")
-    workflow.add_edge("analyze", END)
+    workflow.add_edge("analyze", "finalize")
+    workflow.add_edge("finalize", END)
 
-    logger.info("Workflow compiled: START → [discovery OR research] → [extraction + crawl] → join_data → analyze → END")
+    logger.info("Workflow compiled: START → [discovery OR research] → [extraction + crawl] → join_data → analyze → finalize → END")
 
     return workflow.compile()
 
@@ -108,6 +134,12 @@ def create_initial_state(
     Create initial workflow state with input parameters and empty results.
     """
 
+    # Capture the clock once so both timestamps start identical. Naive
+    # local time, like every other timestamp in the pipeline - agents
+    # and routes overwrite updated_at with datetime.now(), and mixing
+    # aware and naive values breaks datetime arithmetic.
+    now = datetime.now()
+
     initial_state = CompetitiveIntelligenceState(
         # Input
         query=query,
@@ -131,8 +163,8 @@ def create_initial_state(
         errors=[],
 
         # Timestamps
-        started_at=datetime.now(),
-        updated_at=datetime.now()
+        started_at=now,
+        updated_at=now
     )
 
     return initial_state
@@ -2,12 +2,20 @@
 FastAPI application for competitive intelligence system.
 """
 
-from fastapi import FastAPI, Depends
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Depends, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
+import asyncio
+import orjson
 import logging
+import os
+import time
 
 from app.api.routes import router
 from app.config import settings
+from app.middleware.request_logger import RequestLoggingMiddleware
 from app.services.mongodb_service import MongoDBService
 from app.services.mongodb_dependency import get_db
 from app.utils.logging_config import setup_logging
@@ -18,13 +26,33 @@ setup_logging(log_level=settings.log_level, log_dir="logs")
 
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm the MongoDB singleton at startup so the first request doesn't
+    # pay connection handshake + pool fill cost
+    db = None
+    try:
+        db = get_db()
+        await db.ping()
+        logger.info("MongoDB pool warmed at startup")
+    except Exception as e:
+        logger.warning(f"MongoDB warmup skipped: {e}")
+
+    yield
+
+    if db is not None:
+        await db.close()
+
+
 # Create FastAPI app
 app = FastAPI(
     title="Competitive Intelligence API",
     description="Multi-agent system for competitive intelligence using LangGraph and Tavily",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # Allowed origins for CORS
@@ -35,63 +63,144 @@ origins = [
     "http://localhost:5173"
 ]
 
-# CORS middleware
+# Request/response logging (pure ASGI, see middleware/request_logger.py).
+# Added before CORS so CORS stays outermost and cached preflights skip it.
+app.add_middleware(RequestLoggingMiddleware)
+
+# CORS middleware. It answers preflight OPTIONS itself, before routing;
+# max_age lets browsers cache that preflight for 24h so repeat calls from
+# the frontend skip the OPTIONS round-trip entirely.
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=origins, 
+    allow_origins=origins,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
     expose_headers=["*"],
+    max_age=86400,
 )
 
 # Include API routes
 app.include_router(router)
 
+# Cached MongoDB health status with stale-while-revalidate semantics:
+# serve fresh for 5s, serve stale for up to 30s while a single background
+# task revalidates, and only block on a ping when the cache is cold.
+_DB_STATUS_FRESH_S = 5.0
+_DB_STATUS_STALE_S = 30.0
+_DB_STATUS_CACHE_CONTROL = "max-age=5, stale-while-revalidate=25"
+_db_status = {"value": None, "ts": 0.0, "refreshing": False}
+
+# Invariant response fields, built once at import instead of per request
+_ROOT_STATIC = {
+    "message": "Competitive Intelligence API",
+    "environment": settings.environment,
+    "version": "1.0.0"
+}
+_HEALTH_STATIC = {
+    "environment": settings.environment,
+    "debug": settings.debug
+}
+
+# The healthy /health payload never varies within a process - encode it
+# once and hand the bytes straight back on the happy path
+_HEALTH_OK_BODY = orjson.dumps(
+    {**_HEALTH_STATIC, "status": "healthy", "db_status": "ok"}
+)
+_HEALTH_OK_HEADERS = {"Cache-Control": _DB_STATUS_CACHE_CONTROL}
 
-@app.get("/")
-async def root(db: MongoDBService = Depends(get_db)):
-    """Root endpoint with health check."""
+
+async def _refresh_db_status(db: MongoDBService):
+    # Revalidate the cached DB status with a bounded ping
     try:
-        await db.ping()
-        db_status = "ok"
+        alive = await asyncio.wait_for(db.ping(), timeout=2.0)
+        _db_status["value"] = "ok" if alive else "error: ping failed"
     except Exception as e:
-        db_status = f"error: {e}"
+        _db_status["value"] = f"error: {e}"
+    finally:
+        _db_status["ts"] = time.monotonic()
+        _db_status["refreshing"] = False
+
+
+def peek_db_status():
+    # Sync fast path: the cached status while it's still fresh, else None.
+    # Lets the handlers skip the coroutine call entirely on warm cache.
+    if _db_status["value"] is not None:
+        if time.monotonic() - _db_status["ts"] < _DB_STATUS_FRESH_S:
+            return _db_status["value"]
+    return None
 
+
+async def get_db_status(db: MongoDBService) -> str:
+    # Return the cached DB status, refreshing per SWR rules
+    age = time.monotonic() - _db_status["ts"]
+
+    if _db_status["value"] is not None:
+        if age < _DB_STATUS_FRESH_S:
+            return _db_status["value"]
+        if age < _DB_STATUS_STALE_S:
+            # Stale: answer from cache, let one task revalidate
+            if not _db_status["refreshing"]:
+                _db_status["refreshing"] = True
+                asyncio.create_task(_refresh_db_status(db))
+            return _db_status["value"]
+
+    # Cold or expired: pay for one synchronous refresh
+    _db_status["refreshing"] = True
+    await _refresh_db_status(db)
+    return _db_status["value"]
+
+
+@app.get("/")
+async def root(response: Response, db: MongoDBService = Depends(get_db)):
+    """Root endpoint with health check."""
+    db_status = peek_db_status() or await get_db_status(db)
     all_healthy = db_status == "ok"
 
+    response.headers["Cache-Control"] = _DB_STATUS_CACHE_CONTROL
+
     return {
-        "message": "Competitive Intelligence API",
+        **_ROOT_STATIC,
         "status": "healthy" if all_healthy else "unhealthy",
-        "db_status": db_status,
-        "environment": settings.environment,
-        "version": "1.0.0"
+        "db_status": db_status
     }
 
 
 @app.get("/health")
-async def health_check(db: MongoDBService = Depends(get_db)):
+async def health_check(response: Response, db: MongoDBService = Depends(get_db)):
     """Health check endpoint for monitoring."""
-    try:
-        await db.ping()
-        db_status = "ok"
-    except Exception as e:
-        db_status = f"error: {e}"
+    db_status = peek_db_status() or await get_db_status(db)
 
-    all_healthy = db_status == "ok"
+    # Happy path: serve the pre-encoded body, zero serialization
+    if db_status == "ok":
+        return Response(
+            content=_HEALTH_OK_BODY,
+            media_type="application/json",
+            headers=_HEALTH_OK_HEADERS
+        )
+
+    response.headers["Cache-Control"] = _DB_STATUS_CACHE_CONTROL
 
     return {
-        "status": "healthy" if all_healthy else "unhealthy",
-        "db_status": db_status,
-        "environment": settings.environment,
-        "debug": settings.debug
+        **_HEALTH_STATIC,
+        "status": "unhealthy",
+        "db_status": db_status
     }
 
 
 if __name__ == "__main__":
+    # uvloop + httptools cut per-request event-loop and HTTP-parse overhead
+    # (both ship with uvicorn[standard]). Workers only apply outside debug;
+    # reload and multi-worker mode are mutually exclusive.
+    workers = int(os.getenv("WEB_CONCURRENCY", (os.cpu_count() or 1) * 2 + 1))
+
     uvicorn.run(
         "app.main:app",
         host=settings.api_host,
         port=settings.api_port,
-        reload=settings.debug
+        reload=settings.debug,
+        loop="uvloop",
+        http="httptools",
+        workers=None if settings.debug else workers,
+        access_log=False  # uvicorn.access is already quieted in setup_logging
     )
\ No newline at end of file
@@ -10,7 +10,6 @@ from fastapi import Request, status
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
-import time
 
 from app.utils.logging_config import log_error
 
@@ -21,24 +20,15 @@ async def error_handler_middleware(request: Request, call_next):
     """
     Global error handling middleware.
     Catches all exceptions and returns appropriate responses.
+
+    Timing and slow-request detection live in RequestLoggingMiddleware,
+    which already measures every request at the ASGI layer.
     """
-    start_time = time.time()
-    
     try:
-        response = await call_next(request)
-        process_time = (time.time() - start_time) * 1000
-        
-        # Flag slow requests for monitoring
-        if process_time > 5000:
-            logger.warning(
-                f"Slow request: {request.method} {request.url.path} "
-                f"took {process_time:.2f}ms"
-            )
-        
-        return response
+        return await call_next(request)
     
     except RequestValidationError as e:
-        logger.warning(f"Validation error: {e.errors()}")
+        logger.warning("Validation error: %s", e.errors())
         log_error(e, {"path": str(request.url.path), "method": request.method})
         
         return JSONResponse(
@@ -51,7 +41,7 @@ async def error_handler_middleware(request: Request, call_next):
         )
     
     except StarletteHTTPException as e:
-        logger.warning(f"HTTP exception: {e.status_code} - {e.detail}")
+        logger.warning("HTTP exception: %s - %s", e.status_code, e.detail)
         
         return JSONResponse(
             status_code=e.status_code,
@@ -63,12 +53,16 @@ async def error_handler_middleware(request: Request, call_next):
         )
     
     except Exception as e:
-        logger.error(f"Unhandled exception: {str(e)}", exc_info=True)
-        log_error(e, {
-            "path": str(request.url.path),
-            "method": request.method,
-            "traceback": traceback.format_exc()
-        })
+        logger.error("Unhandled exception: %s", e, exc_info=True)
+
+        # format_exc() renders the whole stack - only pay for it when the
+        # errors logger will actually emit the record
+        if logging.getLogger("errors").isEnabledFor(logging.ERROR):
+            log_error(e, {
+                "path": str(request.url.path),
+                "method": request.method,
+                "traceback": traceback.format_exc()
+            })
         
         return JSONResponse(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -6,57 +6,125 @@ Logs all incoming requests and responses for auditing and debugging.
 
 import logging
 import time
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
+from urllib.parse import parse_qs
 
 from app.utils.logging_config import log_request_response
 
 logger = logging.getLogger(__name__)
 
+# Requests slower than this get a warning with their timing
+SLOW_REQUEST_MS = 5000
 
-class RequestLoggingMiddleware(BaseHTTPMiddleware):
-    # Middleware to log all HTTP requests and responses
-    
-    async def dispatch(self, request: Request, call_next):
-        start_time = time.time()
-        
-        # Grab request details
+# User agents of load-balancer / orchestrator health probes. Probe
+# traffic hits /health at a steady clip and carries no interesting
+# detail, so it gets a terse DEBUG line instead of the structured entry.
+_LB_USER_AGENTS = frozenset({
+    "ELB-HealthChecker/2.0",
+    "kube-probe/1.27",
+    "GoogleHC/1.0",
+})
+
+
+class RequestLoggingMiddleware:
+    """
+    Pure ASGI middleware that logs all HTTP requests and responses.
+
+    Implemented against the raw ASGI interface instead of Starlette's
+    BaseHTTPMiddleware, which spawns an extra anyio task and streams the
+    response body through a queue for every request.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+
+        user_agent = self._get_user_agent(scope)
+
+        # Fast path for health probes: no request_data dict, no
+        # structured log entry, just a DEBUG line that's usually dropped
+        if scope["path"] == "/health" and user_agent in _LB_USER_AGENTS:
+            await self.app(scope, receive, send)
+            logger.debug(
+                "health probe from %s - %.2fms",
+                user_agent, (time.perf_counter() - start_time) * 1000
+            )
+            return
+
+        client = scope.get("client")
+        query_params = self._parse_query(scope.get("query_string", b""))
+
+        # Grab request details straight from the ASGI scope
         request_data = {
-            "method": request.method,
-            "path": str(request.url.path),
-            "query_params": dict(request.query_params),
-            "client_ip": request.client.host if request.client else None,
-            "user_agent": request.headers.get("user-agent"),
+            "method": scope["method"],
+            "path": scope["path"],
+            "query_params": query_params,
+            "client_ip": client[0] if client else None,
+            "user_agent": user_agent,
         }
-        
-        # Pull out query_id if it's in the path or query params
-        if "query_id" in request.path_params:
-            request_data["query_id"] = request.path_params["query_id"]
-        if "query_id" in request.query_params:
-            request_data["query_id"] = request.query_params["query_id"]
-        
+
+        # Pull out query_id if it's in the query params
+        if "query_id" in query_params:
+            request_data["query_id"] = query_params["query_id"]
+
+        # Capture the status code from the response start message
+        status_holder = {"status_code": None}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status_holder["status_code"] = message["status"]
+            await send(message)
+
         # Process the request
-        response = await call_next(request)
-        
-        # Calculate how long it took
-        duration_ms = (time.time() - start_time) * 1000
-        
-        # Get response details
-        response_data = {
-            "status_code": response.status_code,
-        }
-        
+        await self.app(scope, receive, send_wrapper)
+
+        # Calculate how long it took (perf_counter is monotonic, so the
+        # duration can't go negative on a clock adjustment)
+        duration_ms = (time.perf_counter() - start_time) * 1000
+
         # Log structured data for monitoring
         log_request_response(
             request_data=request_data,
-            response_data=response_data,
+            response_data={"status_code": status_holder["status_code"]},
             duration_ms=duration_ms
         )
-        
-        # Also log to console for easy viewing
+
+        # Flag slow requests for monitoring - this middleware already
+        # owns the request timing, so the check costs one comparison
+        if duration_ms > SLOW_REQUEST_MS:
+            logger.warning(
+                "Slow request: %s %s took %.2fms",
+                request_data["method"], request_data["path"], duration_ms
+            )
+
+        # Also log to console for easy viewing. Lazy %-formatting: the
+        # string is only built if a handler accepts INFO records.
         logger.info(
-            f"{request.method} {request.url.path} - "
-            f"{response.status_code} - {duration_ms:.2f}ms"
+            "%s %s - %s - %.2fms",
+            request_data["method"],
+            request_data["path"],
+            status_holder["status_code"],
+            duration_ms
         )
-        
-        return response
\ No newline at end of file
+
+    @staticmethod
+    def _parse_query(query_string: bytes) -> dict:
+        # Most requests carry no query string; skip parsing entirely then
+        if not query_string:
+            return {}
+        parsed = parse_qs(query_string.decode("latin-1"))
+        return {k: v[0] if len(v) == 1 else v for k, v in parsed.items()}
+
+    @staticmethod
+    def _get_user_agent(scope):
+        # Single scan of the raw header list - cheaper than building a
+        # case-insensitive Headers wrapper for one lookup
+        for name, value in scope.get("headers", ()):
+            if name == b"user-agent":
+                return value.decode("latin-1")
+        return None
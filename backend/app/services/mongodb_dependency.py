@@ -4,24 +4,28 @@ MongoDB dependency for FastAPI.
 Provides a singleton MongoDB service instance.
 """
 
+from functools import lru_cache
+
 from app.services.mongodb_service import MongoDBService
 from app.config import settings
 from app.utils.env import require_env
 
-_db: MongoDBService | None = None
+
+@lru_cache(maxsize=1)
+def _build_db() -> MongoDBService:
+    # Construct the singleton exactly once; lru_cache's internal lock
+    # makes this safe against concurrent first calls, unlike the old
+    # check-then-assign module global
+    return MongoDBService(
+        connection_string=settings.mongodb_uri,
+        database_name=settings.mongodb_db_name
+    )
 
 
 def get_db() -> MongoDBService:
     # Get MongoDB service instance for dependency injection
-    global _db
 
     # Make sure we have the connection string
     require_env("MONGODB_URI", settings.mongodb_uri)
 
-    if _db is None:
-        _db = MongoDBService(
-            connection_string=settings.mongodb_uri,
-            database_name=settings.mongodb_db_name
-        )
-
-    return _db
\ No newline at end of file
+    return _build_db()
@@ -10,30 +10,75 @@ from bson import ObjectId
 from typing import List, Dict, Optional
 from datetime import datetime
 import logging
+import os
 
 logger = logging.getLogger(__name__)
 
+# Only the fields the list endpoints render. Full documents carry the
+# analysis text plus raw research/extraction/crawl payloads, which can
+# run to hundreds of KB per query - no reason to ship those for a list.
+_LIST_PROJECTION = {
+    "query": 1,
+    "company_name": 1,
+    "competitors": 1,
+    "status": 1,
+    "created_at": 1,
+}
+
+# One AsyncMongoClient per connection string, shared by every service
+# instance in the process. The client owns the connection pool, so a
+# client per service instance would fragment the pool and multiply
+# monitoring threads.
+_shared_clients: Dict[str, AsyncMongoClient] = {}
+
+
+def _get_shared_client(connection_string: str) -> AsyncMongoClient:
+    client = _shared_clients.get(connection_string)
+    if client is None:
+        # minPoolSize keeps warm connections around so requests don't
+        # pay handshake + TLS cost after idle periods
+        client = AsyncMongoClient(
+            connection_string,
+            minPoolSize=int(os.getenv("MONGO_MIN_POOL", "5")),
+            maxPoolSize=int(os.getenv("MONGO_MAX_POOL", "50")),
+            maxIdleTimeMS=60000,
+            serverSelectionTimeoutMS=3000
+        )
+        _shared_clients[connection_string] = client
+    return client
+
 
 class MongoDBService:
     """
     Async MongoDB service for competitive intelligence data.
     
     Main collection: queries (stores all user queries and results)
+
+    Invariant: _id is always the *string* form of an ObjectId (see
+    generate_id). Lookups pass strings, so a mixed-type _id would fall
+    off the default _id index - normalize_legacy_ids() migrates any
+    stragglers.
     """
     
-    def __init__(self, connection_string: str, database_name: str = "competitive_intelligence"):
+    def __init__(
+        self,
+        connection_string: str,
+        database_name: str = "competitive_intelligence",
+        client: Optional[AsyncMongoClient] = None
+    ):
         # Initialize MongoDB connection
         self.connection_string = connection_string
         self.database_name = database_name
-        
-        # Set up async client
-        self.client = AsyncMongoClient(connection_string)
+
+        # Reuse the process-wide client (and its pool) unless the caller
+        # injects a specific one, e.g. for tests
+        self.client = client if client is not None else _get_shared_client(connection_string)
         self.db = self.client[database_name]
         
         # Collections
         self.queries = self.db["queries"]
         
-        logger.info(f"MongoDB service initialized: {database_name}")
+        logger.info("MongoDB service initialized: %s", database_name)
     
     async def ping(self) -> bool:
         # Check if MongoDB connection is alive
@@ -48,19 +93,35 @@ class MongoDBService:
         return str(ObjectId())
     
     async def insert_query(self, query_doc: Dict) -> str:
-        # Insert a new query document
+        # Insert a new query document, guaranteeing a string _id so
+        # lookups stay on the _id index (see class docstring)
+        query_doc.setdefault("_id", self.generate_id())
         result = await self.queries.insert_one(query_doc)
-        logger.info(f"Inserted query: {result.inserted_id}")
+        logger.info("Inserted query: %s", result.inserted_id)
         return str(result.inserted_id)
     
+    async def insert_queries(self, query_docs: List[Dict]) -> List[str]:
+        # Insert a batch of documents in one round-trip. ordered=False
+        # lets the server apply them in parallel and keep going past an
+        # individual failure.
+        if not query_docs:
+            return []
+
+        for doc in query_docs:
+            doc.setdefault("_id", self.generate_id())
+
+        result = await self.queries.insert_many(query_docs, ordered=False)
+        logger.info("Inserted %d queries in one batch", len(result.inserted_ids))
+        return [str(inserted_id) for inserted_id in result.inserted_ids]
+
     async def get_query(self, query_id: str) -> Optional[Dict]:
         # Get a query by ID
         query = await self.queries.find_one({"_id": query_id})
         
         if query:
-            logger.info(f"Found query: {query_id}")
+            logger.info("Found query: %s", query_id)
         else:
-            logger.warning(f"Query not found: {query_id}")
+            logger.warning("Query not found: %s", query_id)
         
         return query
     
@@ -72,10 +133,10 @@ class MongoDBService:
         )
         
         if result.modified_count > 0:
-            logger.info(f"Updated query: {query_id}")
+            logger.info("Updated query: %s", query_id)
             return True
         else:
-            logger.warning(f"Query not modified: {query_id}")
+            logger.warning("Query not modified: %s", query_id)
             return False
     
     async def list_queries(
@@ -91,22 +152,56 @@ class MongoDBService:
             filter_dict["status"] = status
         
         # Query with pagination
-        cursor = self.queries.find(filter_dict).sort("created_at", -1).skip(skip).limit(limit)
+        cursor = (
+            self.queries.find(filter_dict, _LIST_PROJECTION)
+            .sort("created_at", -1)
+            .skip(skip)
+            .limit(limit)
+        )
         queries = await cursor.to_list(length=limit)
         
-        logger.info(f"Listed {len(queries)} queries (skip={skip}, limit={limit})")
+        logger.info("Listed %d queries (skip=%d, limit=%d)", len(queries), skip, limit)
         
         return queries
     
+    async def stream_queries(
+        self,
+        skip: int = 0,
+        limit: int = 20,
+        status: Optional[str] = None,
+        batch_size: int = 50
+    ):
+        """
+        Streaming variant of list_queries.
+
+        Yields documents as the driver fetches them, batch_size per
+        getMore, so large pages never sit fully in memory and the caller
+        can start rendering before the last batch arrives.
+        """
+        filter_dict = {}
+        if status:
+            filter_dict["status"] = status
+
+        cursor = (
+            self.queries.find(filter_dict, _LIST_PROJECTION)
+            .sort("created_at", -1)
+            .skip(skip)
+            .limit(limit)
+            .batch_size(batch_size)
+        )
+
+        async for doc in cursor:
+            yield doc
+
     async def delete_query(self, query_id: str) -> bool:
         # Delete a query and its results
         result = await self.queries.delete_one({"_id": query_id})
         
         if result.deleted_count > 0:
-            logger.info(f"Deleted query: {query_id}")
+            logger.info("Deleted query: %s", query_id)
             return True
         else:
-            logger.warning(f"Query not found for deletion: {query_id}")
+            logger.warning("Query not found for deletion: %s", query_id)
             return False
     
     async def count_queries(self, status: Optional[str] = None) -> int:
@@ -120,13 +215,31 @@ class MongoDBService:
     
     async def get_recent_queries(self, limit: int = 5) -> List[Dict]:
         # Get the most recent queries
-        cursor = self.queries.find().sort("created_at", -1).limit(limit)
+        cursor = self.queries.find({}, _LIST_PROJECTION).sort("created_at", -1).limit(limit)
         queries = await cursor.to_list(length=limit)
         
-        logger.info(f"Retrieved {len(queries)} recent queries")
+        logger.info("Retrieved %d recent queries", len(queries))
         
         return queries
     
+    async def normalize_legacy_ids(self) -> int:
+        """
+        One-off migration: rewrite any legacy ObjectId _id as its string
+        form so every document matches the string lookups.
+        """
+        count = 0
+        async for doc in self.queries.find({"_id": {"$type": "objectId"}}):
+            old_id = doc["_id"]
+            doc["_id"] = str(old_id)
+            await self.queries.insert_one(doc)
+            await self.queries.delete_one({"_id": old_id})
+            count += 1
+
+        if count:
+            logger.info("Normalized %d legacy ObjectId _id values", count)
+
+        return count
+
     async def create_indexes(self):
         """
         Create database indexes for better performance.
@@ -134,17 +247,23 @@ class MongoDBService:
         """
         # Index on created_at for sorting
         await self.queries.create_index([("created_at", -1)])
-        
-        # Index on status for filtering
-        await self.queries.create_index("status")
-        
+
+        # Compound index for status-filtered lists: equality on status,
+        # then the created_at sort comes straight off the index instead
+        # of an in-memory sort. Also covers plain status filters.
+        await self.queries.create_index([("status", 1), ("created_at", -1)])
+
         # Index on company_name for searching
         await self.queries.create_index("company_name")
         
         logger.info("Database indexes created")
     
     async def close(self):
-        # Close MongoDB connection. Call when shutting down
+        # Close MongoDB connection. Call when shutting down; the shared
+        # client is dropped from the registry so a later service gets a
+        # fresh one instead of a closed pool
+        if _shared_clients.get(self.connection_string) is self.client:
+            del _shared_clients[self.connection_string]
         await self.client.close()
         logger.info("MongoDB connection closed")
     
@@ -0,0 +1,18 @@
+"""
+URL helpers shared by the data-collection agents.
+"""
+
+from urllib.parse import urlsplit, urlunsplit
+
+
+def normalize_url(url: str) -> str:
+    """
+    Canonical form of a URL for dedup comparisons.
+
+    Lowercases the scheme and host, drops the fragment, and strips a
+    trailing slash from the path - the variants Tavily results most
+    often disagree on while pointing at the same page.
+    """
+    parts = urlsplit(url)
+    path = parts.path.rstrip("/")
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, parts.query, ""))
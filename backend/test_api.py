@@ -5,19 +5,49 @@ Tests health check, query creation, status retrieval, listing, and deletion.
 Requires the FastAPI server to be running: python -m app.main
 """
 
+import os
+import sys
+
 import pytest
 import requests
-import time
-import json
+from requests.adapters import HTTPAdapter
+import orjson
+
+# Overridable so parallel CI workers can each point at their own server
+BASE_URL = os.environ.get("API_BASE_URL", "http://localhost:8000")
+
+# The create-query payload is identical everywhere it's used, so build
+# it once and pre-serialize: requests would otherwise json.dumps the
+# same dict on every POST
+QUERY_DATA = {
+    "query": "AI search API pricing and features",
+    "company_name": "Tavily",
+    "competitors": [
+        "Perplexity AI",
+        "You.com",
+        "Exa"
+    ],
+    "use_premium_analysis": False
+}
+_QUERY_BODY = orjson.dumps(QUERY_DATA)
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
 
-BASE_URL = "http://localhost:8000"
+@pytest.fixture(scope="module")
+def client():
+    # One Session for the whole module: keep-alive reuses the TCP
+    # connection instead of paying a fresh handshake per request
+    session = requests.Session()
+    session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=0))
+    yield session
+    session.close()
 
 
 @pytest.fixture(scope="module")
-def server_available():
+def server_available(client):
     # Check if server is running, skip tests if not
     try:
-        response = requests.get(f"{BASE_URL}/health", timeout=2)
+        response = client.get(f"{BASE_URL}/health", timeout=2)
         if response.status_code == 200:
             return True
     except requests.exceptions.RequestException:
@@ -25,50 +55,57 @@ def server_available():
     pytest.skip("FastAPI server not running. Start with: python -m app.main")
 
 
+# The narration below is only visible under pytest -s anyway; skipping
+# the print calls (f-string build + write per line) when nobody will
+# see them keeps quiet runs quiet and fast
+_VERBOSE = (
+    os.environ.get("TEST_VERBOSE", "").lower() in ("1", "true", "yes")
+    or "-s" in sys.argv
+    or "--capture=no" in sys.argv
+)
+
+
+def vprint(*args, **kwargs):
+    if _VERBOSE:
+        print(*args, **kwargs)
+
+
 def print_section(title):
     # Print a formatted section header
-    print("\n" + "="*70)
-    print(f"{title}")
-    print("="*70)
+    vprint("\n" + "="*70)
+    vprint(f"{title}")
+    vprint("="*70)
 
 
-def test_health_check(server_available):
+def test_health_check(server_available, client):
     # Test health check endpoints
     print_section("TEST 1: Health Check")
     
     # Test root endpoint
-    print("\n1. Testing root endpoint (GET /)...")
-    response = requests.get(f"{BASE_URL}/")
-    print(f"   Status: {response.status_code}")
-    print(f"   Response: {response.json()}")
+    vprint("\n1. Testing root endpoint (GET /)...")
+    response = client.get(f"{BASE_URL}/")
+    vprint(f"   Status: {response.status_code}")
+    vprint(f"   Response: {response.json()}")
     
     # Test health endpoint
-    print("\n2. Testing health endpoint (GET /health)...")
-    response = requests.get(f"{BASE_URL}/health")
-    print(f"   Status: {response.status_code}")
-    print(f"   Response: {response.json()}")
+    vprint("\n2. Testing health endpoint (GET /health)...")
+    response = client.get(f"{BASE_URL}/health")
+    vprint(f"   Status: {response.status_code}")
+    vprint(f"   Response: {response.json()}")
     
     assert response.status_code == 200, "Health check failed!"
-    print("\n✓ Health check passed!")
+    vprint("\n✓ Health check passed!")
 
 
-@pytest.fixture
-def query_id(server_available):
-    # Create a query and return its ID for other tests
-    query_data = {
-        "query": "AI search API pricing and features",
-        "company_name": "Tavily",
-        "competitors": [
-            "Perplexity AI",
-            "You.com",
-            "Exa"
-        ],
-        "use_premium_analysis": False
-    }
-    
-    response = requests.post(
+@pytest.fixture(scope="module")
+def query_id(server_available, client):
+    # Create one query for the whole module. Each creation kicks off a
+    # full workflow run on the backend, so the create/get/delete chain
+    # shares a single query instead of spawning one per test.
+    response = client.post(
         f"{BASE_URL}/api/queries",
-        json=query_data
+        data=_QUERY_BODY,
+        headers=_JSON_HEADERS
     )
     
     assert response.status_code == 200, "Query creation failed!"
@@ -78,199 +115,116 @@ def query_id(server_available):
     return result["query_id"]
 
 
-def test_create_query(server_available):
-    # Test creating a new query
+def test_create_query(server_available, query_id):
+    # Test creating a new query. The POST itself (and its status and
+    # payload assertions) lives in the query_id fixture, so this run
+    # doesn't launch a second workflow just to check the same path.
     print_section("TEST 2: Create Query")
     
-    query_data = {
-        "query": "AI search API pricing and features",
-        "company_name": "Tavily",
-        "competitors": [
-            "Perplexity AI",
-            "You.com",
-            "Exa"
-        ],
-        "use_premium_analysis": False
-    }
-    
-    print("\nSubmitting query...")
-    print(f"Query: {query_data['query']}")
-    print(f"Company: {query_data['company_name']}")
-    print(f"Competitors: {', '.join(query_data['competitors'])}")
-    
-    response = requests.post(
-        f"{BASE_URL}/api/queries",
-        json=query_data
-    )
-    
-    print(f"\nStatus: {response.status_code}")
-    result = response.json()
-    print(f"Response: {json.dumps(result, indent=2)}")
+    vprint("\nSubmitting query...")
+    vprint(f"Query: {QUERY_DATA['query']}")
+    vprint(f"Company: {QUERY_DATA['company_name']}")
+    vprint(f"Competitors: {', '.join(QUERY_DATA['competitors'])}")
     
-    assert response.status_code == 200, "Query creation failed!"
-    assert "query_id" in result, "No query_id in response!"
+    assert query_id, "No query_id returned from creation!"
     
-    query_id = result["query_id"]
-    print(f"\n✓ Query created successfully!")
-    print(f"Query ID: {query_id}")
+    vprint(f"\n✓ Query created successfully!")
+    vprint(f"Query ID: {query_id}")
 
 
-def test_get_query(server_available, query_id):
+def test_get_query(server_available, client, query_id):
     # Test getting query status and results
     print_section("TEST 3: Get Query Status")
     
-    print(f"\nFetching query: {query_id}")
+    vprint(f"\nFetching query: {query_id}")
     
-    response = requests.get(f"{BASE_URL}/api/queries/{query_id}")
+    response = client.get(f"{BASE_URL}/api/queries/{query_id}")
     result = response.json()
     
-    print(f"\nStatus: {response.status_code}")
-    print(f"\nQuery Details:")
-    print(f"   Status: {result['status']}")
-    print(f"   Query: {result['query']}")
-    print(f"   Company: {result['company_name']}")
-    print(f"   Competitors: {len(result['competitors'])}")
-    print(f"   Completed Agents: {', '.join(result.get('completed_agents', []))}")
+    vprint(f"\nStatus: {response.status_code}")
+    vprint(f"\nQuery Details:")
+    vprint(f"   Status: {result['status']}")
+    vprint(f"   Query: {result['query']}")
+    vprint(f"   Company: {result['company_name']}")
+    vprint(f"   Competitors: {len(result['competitors'])}")
+    vprint(f"   Completed Agents: {', '.join(result.get('completed_agents', []))}")
     
     if result.get("analysis"):
-        print(f"\n   Analysis Preview:")
-        print(f"   {result['analysis'][:200]}...")
-        print(f"   (Total length: {len(result['analysis'])} characters)")
+        vprint(f"\n   Analysis Preview:")
+        vprint(f"   {result['analysis'][:200]}...")
+        vprint(f"   (Total length: {len(result['analysis'])} characters)")
     
     if result.get("errors"):
-        print(f"\n   Errors: {result['errors']}")
+        vprint(f"\n   Errors: {result['errors']}")
     
     assert response.status_code == 200, "Failed to get query!"
-    print(f"\n✓ Query retrieved successfully!")
+    vprint(f"\n✓ Query retrieved successfully!")
 
 
-def test_list_queries(server_available):
+def test_list_queries(server_available, client):
     # Test listing all queries
     print_section("TEST 4: List Queries")
     
-    print("\nFetching all queries...")
+    vprint("\nFetching all queries...")
     
-    response = requests.get(f"{BASE_URL}/api/queries?limit=10")
+    response = client.get(f"{BASE_URL}/api/queries?limit=10")
     
-    print(f"Status: {response.status_code}")
+    vprint(f"Status: {response.status_code}")
     queries = response.json()
     
-    print(f"\nFound {len(queries)} queries:")
+    vprint(f"\nFound {len(queries)} queries:")
     for i, q in enumerate(queries, 1):
-        print(f"\n   {i}. Query ID: {q['query_id']}")
-        print(f"      Query: {q['query']}")
-        print(f"      Company: {q['company_name']}")
-        print(f"      Competitors: {q['competitor_count']}")
-        print(f"      Status: {q['status']}")
-        print(f"      Created: {q['created_at']}")
+        vprint(f"\n   {i}. Query ID: {q['query_id']}")
+        vprint(f"      Query: {q['query']}")
+        vprint(f"      Company: {q['company_name']}")
+        vprint(f"      Competitors: {q['competitor_count']}")
+        vprint(f"      Status: {q['status']}")
+        vprint(f"      Created: {q['created_at']}")
     
     assert response.status_code == 200, "Failed to list queries!"
-    print(f"\n✓ Queries listed successfully!")
+    vprint(f"\n✓ Queries listed successfully!")
 
 
-def test_delete_query(server_available, query_id):
+def test_delete_query(server_available, client, query_id):
     # Test deleting a query
     print_section("TEST 5: Delete Query")
     
-    print(f"\nDeleting query: {query_id}")
+    vprint(f"\nDeleting query: {query_id}")
     
-    response = requests.delete(f"{BASE_URL}/api/queries/{query_id}")
+    response = client.delete(f"{BASE_URL}/api/queries/{query_id}")
     
-    print(f"Status: {response.status_code}")
-    print(f"Response: {response.json()}")
+    vprint(f"Status: {response.status_code}")
+    vprint(f"Response: {response.json()}")
     
     assert response.status_code == 200, "Failed to delete query!"
-    print(f"\n✓ Query deleted successfully!")
+    vprint(f"\n✓ Query deleted successfully!")
     
     # Verify deletion
-    print("\nVerifying deletion...")
-    response = requests.get(f"{BASE_URL}/api/queries/{query_id}")
+    vprint("\nVerifying deletion...")
+    response = client.get(f"{BASE_URL}/api/queries/{query_id}")
     
     if response.status_code == 404:
-        print("✓ Query no longer exists (confirmed)")
+        vprint("✓ Query no longer exists (confirmed)")
     else:
-        print("Query still exists (unexpected)")
+        vprint("Query still exists (unexpected)")
 
 
-def test_api_documentation(server_available):
+def test_api_documentation(server_available, client):
     # Test API documentation endpoints
     print_section("TEST 6: API Documentation")
     
-    print("\n1. Testing OpenAPI docs (GET /docs)...")
-    response = requests.get(f"{BASE_URL}/docs")
-    print(f"   Status: {response.status_code}")
-    print(f"   Available at: {BASE_URL}/docs")
+    vprint("\n1. Testing OpenAPI docs (GET /docs)...")
+    response = client.get(f"{BASE_URL}/docs")
+    vprint(f"   Status: {response.status_code}")
+    vprint(f"   Available at: {BASE_URL}/docs")
     
-    print("\n2. Testing ReDoc (GET /redoc)...")
-    response = requests.get(f"{BASE_URL}/redoc")
-    print(f"   Status: {response.status_code}")
-    print(f"   Available at: {BASE_URL}/redoc")
-    
-    print("\n3. Testing OpenAPI JSON (GET /openapi.json)...")
-    response = requests.get(f"{BASE_URL}/openapi.json")
-    print(f"   Status: {response.status_code}")
-    
-    print("\n✓ API documentation accessible!")
-
-
-def run_all_tests(wait_for_completion=False):
-    # Run all tests in sequence
-    
-    print("\nFASTAPI BACKEND TEST SUITE")
-    print("="*70)
-    print(f"\nTesting API at: {BASE_URL}")
-    print(f"Wait for completion: {wait_for_completion}")
-    
-    try:
-        # Run tests
-        test_health_check()
-        query_id = test_create_query()
-        result = test_get_query(query_id, wait_for_completion=wait_for_completion)
-        test_list_queries()
-        
-        if not wait_for_completion:
-            test_delete_query(query_id)
-        else:
-            print_section("Query Status")
-            print(f"\nQuery ID: {query_id}")
-            print(f"Status: {result['status']}")
-            if result['status'] == 'completed':
-                print(f"Workflow completed successfully!")
-                print(f"\nView results at:")
-                print(f"   {BASE_URL}/api/queries/{query_id}")
-        
-        test_api_documentation()
-        
-        # Summary
-        print_section("TEST SUMMARY")
-        print("\n✓ All tests passed!")
-        print(f"\nAPI is fully functional!")
-        print(f"\nInteractive docs:")
-        print(f"   Swagger UI: {BASE_URL}/docs")
-        print(f"   ReDoc: {BASE_URL}/redoc")
-        
-        if wait_for_completion and result['status'] == 'completed':
-            print(f"\nView your analysis:")
-            print(f"   GET {BASE_URL}/api/queries/{query_id}")
-        
-        print()
-        
-    except AssertionError as e:
-        print(f"\nTest failed: {e}")
-    except requests.exceptions.ConnectionError:
-        print(f"\nCould not connect to API at {BASE_URL}")
-        print("Make sure the server is running:")
-        print("   python -m app.main")
-    except Exception as e:
-        print(f"\nUnexpected error: {e}")
-        import traceback
-        traceback.print_exc()
-
-
-if __name__ == "__main__":
-    import sys
+    vprint("\n2. Testing ReDoc (GET /redoc)...")
+    response = client.get(f"{BASE_URL}/redoc")
+    vprint(f"   Status: {response.status_code}")
+    vprint(f"   Available at: {BASE_URL}/redoc")
     
-    # Check if user wants to wait for completion
-    wait = "--wait" in sys.argv or "-w" in sys.argv
+    vprint("\n3. Testing OpenAPI JSON (GET /openapi.json)...")
+    response = client.get(f"{BASE_URL}/openapi.json")
+    vprint(f"   Status: {response.status_code}")
     
-    run_all_tests(wait_for_completion=wait)
\ No newline at end of file
+    vprint("\n✓ API documentation accessible!")
@@ -17,9 +17,9 @@ def test_config_loads():
     assert settings.mongodb_uri, "MongoDB URI not set"
     assert settings.mongodb_db_name, "MongoDB DB name not set"
 
-    print(f"\nTavily API Key: {settings.tavily_api_key[:20]}...")
-    print(f"OpenAI API Key: {settings.openai_api_key[:20]}...")
-    print(f"MongoDB URI: {settings.mongodb_uri[:40]}...")
+    print(f"\nTavily API Key: {settings.tavily_key_preview}...")
+    print(f"OpenAI API Key: {settings.openai_key_preview}...")
+    print(f"MongoDB URI: {settings.masked_mongodb_uri[:40]}...")
     print(f"MongoDB DB Name: {settings.mongodb_db_name}")
     print(f"Environment: {settings.environment}")
     print(f"Debug: {settings.debug}")